@@ -3,8 +3,9 @@ AI-Driven Smart Queue Routing System (SQRS) - FastAPI Backend
 Main application entry point
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from contextlib import asynccontextmanager
 from datetime import datetime
 import uvicorn
@@ -63,6 +64,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger responses (routing results, full queue dumps); tiny
+# payloads skip compression via the size floor
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 
 @app.get("/")
 async def root():
@@ -211,17 +216,32 @@ async def health_check():
 
 
 # Customer Management Endpoints
+@app.head("/customers")
+async def head_customers(response: Response):
+    """Cheap queue-size probe: the count travels in a header with no body"""
+    response.headers["X-Queue-Count"] = str(len(app.state.data_store.customers))
+
+
 @app.get("/customers")
-async def get_customers():
-    """Returns all customers currently in queue"""
+async def get_customers(limit: int = 0, order: str = "asc"):
+    """Returns customers currently in queue, optionally just a slice"""
     app.state.data_store.update_wait_times()
     customers = app.state.data_store.get_customers()
-    return {"customers": customers, "count": len(customers)}
+    count = len(customers)
+    if order == "desc":
+        customers = customers[::-1]
+    if limit:
+        customers = customers[:limit]
+    return {"customers": customers, "count": count}
 
 
 @app.post("/customers")
-async def add_customer(customer_data: CustomerCreate):
+async def add_customer(customer_data: CustomerCreate, dry_run: bool = False):
     """Adds a new customer to the queue"""
+    # dry_run short-circuits right after Pydantic validation: no store
+    # write, no queue mutation - a cheap way to probe the validators
+    if dry_run:
+        return {"valid": True, "message": "Validation passed (dry run)"}
     try:
         # Create customer with default wait_time of 0
         customer = Customer(
@@ -239,8 +259,10 @@ async def add_customer(customer_data: CustomerCreate):
 
 
 @app.post("/customer/submit-query")
-async def submit_customer_query(query: CustomerQuery):
+async def submit_customer_query(query: CustomerQuery, dry_run: bool = False):
     """Customer submits a query and gets added to queue"""
+    if dry_run:
+        return {"valid": True, "message": "Validation passed (dry run)"}
     try:
         # Create customer from query
         customer = Customer(
@@ -420,10 +442,19 @@ async def manual_route(assignment: ManualAssignment):
 
 
 @app.get("/routing/results")
-async def get_routing_results():
+async def get_routing_results(request: Request, response: Response):
     """Get all current routing results"""
     try:
         routing_results = app.state.data_store.get_routing_results()
+        # Fingerprint the (id, status) pairs: any transition changes the tag,
+        # so clients can poll with If-None-Match and get a bodyless 304
+        # until something actually happens
+        etag = hashlib.md5(
+            "|".join(f"{r.id}:{r.status}" for r in routing_results).encode()
+        ).hexdigest()
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304)
+        response.headers["ETag"] = etag
         return {"results": routing_results}
     except Exception as e:
         print(f"❌ Error getting routing results: {str(e)}")
@@ -1059,6 +1090,58 @@ async def send_sms_alert(routing_id: str, alert_data: dict):
         return {"error": f"Failed to send SMS alert: {str(e)}"}, 500
 
 
+@app.post("/conversation/{routing_id}/send-sms-alerts")
+async def send_sms_alerts(routing_id: str, alert_data: dict):
+    """Send a batch of SMS alerts for one conversation in a single request"""
+    try:
+        # Get the routing result once for the whole batch
+        routing_results = app.state.data_store.get_routing_results()
+        routing_result = next((r for r in routing_results if r.id == routing_id), None)
+
+        if not routing_result:
+            raise HTTPException(status_code=404, detail="Routing result not found")
+
+        customer_name = routing_result.customer_name or "Customer"
+        agent_name = routing_result.agent_name or "Agent"
+
+        alerts = []
+        for alert_type in alert_data.get("types", []):
+            # Simulate SMS sending (in real implementation, integrate with SMS service like Twilio)
+            if alert_type == "warning":
+                sms_message = f"Hi {customer_name}, your conversation with {agent_name} has 2 minutes remaining. Please wrap up your discussion. - Smart Queue System"
+            else:
+                sms_message = f"Hi {customer_name}, your 10-minute conversation limit with {agent_name} has been reached. Please end the conversation. - Smart Queue System"
+
+            # Log SMS for demo (in production, send actual SMS)
+            print(f"📱 SMS Alert Sent:")
+            print(f"   To: Customer {customer_name}")
+            print(f"   Message: {sms_message}")
+            print(f"   Type: {alert_type}")
+
+            routing_result.sms_alerts.append({
+                "type": alert_type,
+                "message": sms_message,
+                "sent_at": datetime.now().isoformat(),
+                "status": "sent"
+            })
+            alerts.append({
+                "sms_message": sms_message,
+                "alert_type": alert_type,
+                "customer_name": customer_name
+            })
+
+        return {
+            "message": f"{len(alerts)} SMS alerts sent successfully",
+            "alerts": alerts
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Error sending SMS alerts: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to send SMS alerts: {str(e)}")
+
+
 @app.get("/conversation/{routing_id}/time-status")
 async def get_conversation_time_status(routing_id: str):
     """Get conversation time status and check if limits are exceeded"""
@@ -17,16 +17,27 @@ class DatabaseManager:
     
     def __init__(self, db_path: str = "backend/database/sqrs.db"):
         self.db_path = db_path
-        self.ensure_database_exists()
+        # A ":memory:" database lives and dies with its connection, so keep
+        # one open for the manager's lifetime instead of one per operation
+        self._memory_conn = None
+        if db_path == ":memory:":
+            self._memory_conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._memory_conn.row_factory = sqlite3.Row
+        else:
+            self.ensure_database_exists()
         self.init_tables()
-    
+
     def ensure_database_exists(self):
         """Ensure database directory exists"""
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-    
+
     @contextmanager
     def get_connection(self):
         """Context manager for database connections with optimizations"""
+        if self._memory_conn is not None:
+            # In-memory pager: no journal or fsync tuning applies
+            yield self._memory_conn
+            return
         conn = sqlite3.connect(self.db_path, check_same_thread=False)
         conn.row_factory = sqlite3.Row  # Enable dict-like access
         # Enable WAL mode for better concurrent access
@@ -171,6 +182,32 @@ class DatabaseManager:
             print(f"❌ Error adding customer: {e}")
             return False
     
+    def add_customers_bulk(self, customers: List[Customer]) -> bool:
+        """Add many customers in a single transaction
+
+        executemany under one BEGIN/COMMIT pays one fsync for the whole
+        batch instead of one per row, which dominates insert cost on
+        disk-backed databases.
+        """
+        try:
+            with self.get_connection() as conn:
+                conn.executemany('''
+                    INSERT INTO customers (
+                        id, name, sentiment, tier, issue_type, channel,
+                        priority, issue_complexity, wait_time, status
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', [
+                    (customer.id, customer.name, customer.sentiment, customer.tier,
+                     customer.issue_type, customer.channel, customer.priority,
+                     customer.issue_complexity, customer.wait_time, 'waiting')
+                    for customer in customers
+                ])
+                conn.commit()
+                return True
+        except Exception as e:
+            print(f"❌ Error bulk adding customers: {e}")
+            return False
+
     def get_customers(self, status: str = 'waiting') -> List[Customer]:
         """Get all customers with specified status"""
         try:
@@ -106,6 +106,7 @@ class RoutingResult(BaseModel):
     customer_feedback: Optional[CustomerFeedback] = None
     actual_handling_time: Optional[float] = Field(None, ge=0.0)
     success_outcome: Optional[bool] = None
+    sms_alerts: List[Dict[str, Any]] = Field(default_factory=list)
 
 
 class ManualAssignment(BaseModel):
@@ -13,8 +13,10 @@ from database.db_manager import DatabaseManager
 class DataStore:
     """SQLite-backed data store with fallback in-memory storage"""
     
-    def __init__(self):
-        self.db = DatabaseManager()
+    def __init__(self, db: Optional[DatabaseManager] = None):
+        # Accept an injected manager so tests can share an in-memory
+        # database instead of opening the on-disk default
+        self.db = db if db is not None else DatabaseManager()
         # Fallback in-memory storage
         self.customers: Dict[str, Customer] = {}
         self.agents: Dict[str, Agent] = {}
@@ -3,11 +3,18 @@
 Complete startup script for the Smart Queue Routing System with Authentication
 """
 
+import selectors
 import subprocess
+try:
+    import fcntl
+except ImportError:  # Windows has no fcntl
+    fcntl = None
 import sys
+import threading
 import time
 import os
 import webbrowser
+from importlib.metadata import distribution, PackageNotFoundError
 from pathlib import Path
 
 def print_banner():
@@ -26,15 +33,16 @@ def check_dependencies():
     """Check if required dependencies are installed"""
     print("\n📋 Checking Dependencies...")
     
-    # Check Python packages
+    # Check Python packages against the installed-package index on disk -
+    # no need to actually import flask/bcrypt just to confirm presence
     required_packages = ['flask', 'flask-cors', 'flask-jwt-extended', 'bcrypt', 'requests']
     missing_packages = []
-    
+
     for package in required_packages:
         try:
-            __import__(package.replace('-', '_'))
+            distribution(package)
             print(f"✅ {package}")
-        except ImportError:
+        except PackageNotFoundError:
             missing_packages.append(package)
             print(f"❌ {package} - MISSING")
     
@@ -53,6 +61,66 @@ def check_dependencies():
     
     return True
 
+class _PipeMultiplexer:
+    """Drain every child pipe from one selector-driven reader thread
+
+    One thread plus an epoll/kqueue selector replaces a pair of blocking
+    reader threads per child: four stacks and four GIL contenders become one
+    thread that sleeps in the kernel until any pipe has data.
+    """
+
+    def __init__(self):
+        self.selector = selectors.DefaultSelector()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def register(self, process, needle=None):
+        """Watch a child's stdout/stderr; returns a readiness Event if a
+        needle is given, set when the marker appears in either stream."""
+        ready_event = threading.Event() if needle is not None else None
+        with self.lock:
+            for stream, sink in ((process.stdout, sys.stdout), (process.stderr, sys.stderr)):
+                if stream is not None:
+                    if fcntl is not None:
+                        # Grow the kernel pipe buffer from the 64KB default to
+                        # 1MB so a bursty child rarely blocks on a full pipe
+                        # between selector wakeups (F_SETPIPE_SZ is 1031)
+                        try:
+                            fcntl.fcntl(stream.fileno(),
+                                        getattr(fcntl, "F_SETPIPE_SZ", 1031), 1 << 20)
+                        except OSError:
+                            pass  # Unprivileged size cap; the default still works
+                    os.set_blocking(stream.fileno(), False)
+                    self.selector.register(
+                        stream, selectors.EVENT_READ, (sink, needle, ready_event)
+                    )
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+        return ready_event
+
+    def _run(self):
+        while True:
+            # Short timeout so pipes registered after select() went to sleep
+            # are picked up on the next iteration
+            for key, _ in self.selector.select(timeout=0.5):
+                stream = key.fileobj
+                sink, needle, ready_event = key.data
+                chunk = os.read(stream.fileno(), 65536)
+                if not chunk:
+                    self.selector.unregister(stream)
+                    stream.close()
+                    continue
+                # Startup banners are short single writes, so scanning each
+                # chunk is enough to spot the readiness marker
+                if needle is not None and needle in chunk:
+                    ready_event.set()
+                sink.write(chunk.decode(errors='replace'))
+
+
+_MULTIPLEXER = _PipeMultiplexer()
+
+
 def start_backend():
     """Start the Flask backend server"""
     print("\n🔧 Starting Backend Server...")
@@ -65,19 +133,20 @@ def start_backend():
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE
         )
-        
-        # Wait a moment for server to start
-        time.sleep(3)
-        
+        # Drain the pipes asynchronously; without this the child stalls once
+        # its log volume exceeds the OS pipe buffer (~64KB). The reader
+        # thread flags readiness the instant the startup banner arrives, so
+        # the main thread sleeps on the Event rather than polling the port
+        ready = _MULTIPLEXER.register(backend_process, needle=b"Uvicorn running on")
+        port_ready = ready.wait(timeout=10)
+
         # Check if process is still running
-        if backend_process.poll() is None:
+        if port_ready and backend_process.poll() is None:
             print("✅ Backend server started on http://localhost:8000")
             return backend_process
         else:
-            stdout, stderr = backend_process.communicate()
-            print(f"❌ Backend failed to start:")
-            print(f"   stdout: {stdout.decode()}")
-            print(f"   stderr: {stderr.decode()}")
+            print(f"❌ Backend failed to start (exit code {backend_process.returncode})")
+            print("   See the server output above for details")
             return None
             
     except Exception as e:
@@ -109,18 +178,17 @@ def start_frontend():
         if not frontend_process:
             print("❌ Could not find npm command")
             return None
-        
-        # Wait for frontend to start
-        time.sleep(5)
-        
-        if frontend_process.poll() is None:
+
+        # Vite announces readiness with its "Local:" URL line
+        ready = _MULTIPLEXER.register(frontend_process, needle=b"Local:")
+        port_ready = ready.wait(timeout=30)
+
+        if port_ready and frontend_process.poll() is None:
             print("✅ Frontend server started on http://localhost:3000")
             return frontend_process
         else:
-            stdout, stderr = frontend_process.communicate()
-            print(f"❌ Frontend failed to start:")
-            print(f"   stdout: {stdout.decode()}")
-            print(f"   stderr: {stderr.decode()}")
+            print(f"❌ Frontend failed to start (exit code {frontend_process.returncode})")
+            print("   See the server output above for details")
             return None
             
     except Exception as e:
@@ -223,9 +291,9 @@ def main():
     print(f"\n⚡ System is running! Press Ctrl+C to stop all servers.")
     
     try:
-        # Keep script running
-        while True:
-            time.sleep(1)
+        # Sleep until Ctrl+C - an Event nobody sets means zero idle wakeups,
+        # unlike the old 1Hz sleep loop
+        threading.Event().wait()
     except KeyboardInterrupt:
         print(f"\n🛑 Shutting down servers...")
         backend_process.terminate()
@@ -3,37 +3,35 @@
 Quick test to verify customer addition works
 """
 
-import requests
-import json
+import orjson
+
+from api_client import client
+
+# Constant request body: built and encoded once at import
+CUSTOMER_DATA = {
+    "name": "Test Customer",
+    "sentiment": "positive",
+    "tier": "premium",
+    "issue_type": "technical_support",
+    "channel": "phone",
+    "priority": 8,
+    "issue_complexity": 3.5
+}
+CUSTOMER_PAYLOAD = orjson.dumps(CUSTOMER_DATA)
 
 def test_add_customer():
     """Test adding a customer"""
     print("🧪 Testing Customer Addition...")
     
-    # Test customer data
-    customer_data = {
-        "name": "Test Customer",
-        "sentiment": "positive",
-        "tier": "premium",
-        "issue_type": "technical_support",
-        "channel": "phone",
-        "priority": 8,
-        "issue_complexity": 3.5
-    }
-    
     try:
         # Add customer
-        print(f"📤 Sending customer data: {customer_data['name']}")
-        response = requests.post(
-            "http://localhost:8000/customers",
-            json=customer_data,
-            headers={"Content-Type": "application/json"}
-        )
+        print(f"📤 Sending customer data: {CUSTOMER_DATA['name']}")
+        response = client.post("/customers", data=CUSTOMER_PAYLOAD)
         
         print(f"📥 Response status: {response.status_code}")
         
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             print(f"✅ Customer added successfully!")
             print(f"   ID: {data['customer']['id']}")
             print(f"   Name: {data['customer']['name']}")
@@ -41,15 +39,15 @@ def test_add_customer():
             
             # Verify customer is in queue
             print("\n🔍 Checking customer queue...")
-            queue_response = requests.get("http://localhost:8000/customers")
-            queue_data = queue_response.json()
+            queue_response = client.get("/customers")
+            queue_data = orjson.loads(queue_response.content)
             
             print(f"📊 Customers in queue: {queue_data['count']}")
             
             # Find our customer
             found = False
             for customer in queue_data['customers']:
-                if customer['name'] == customer_data['name']:
+                if customer['name'] == CUSTOMER_DATA['name']:
                     found = True
                     print(f"✅ Customer found in queue!")
                     print(f"   ID: {customer['id']}")
@@ -5,19 +5,49 @@ Quick test script to verify database and auto routing functionality
 
 import sys
 import os
+from pathlib import Path
 sys.path.append('backend')
 
 from database.db_manager import DatabaseManager
 from services.data_store import DataStore
 from models.data_models import Customer
 
+# Snapshot of the populated database, written after the first run so
+# later runs skip the mock generation and its inserts entirely
+FIXTURE_CACHE = Path("tests/.cache/mock.sqlite.bin")
+
+
+def initialize_mock_data_cached(db, data_store):
+    """Populate mock data, restoring the cached snapshot when available"""
+    with db.get_connection() as conn:
+        if FIXTURE_CACHE.exists():
+            conn.deserialize(FIXTURE_CACHE.read_bytes())
+            print("✅ Mock data restored from cached fixture")
+            return
+        data_store.initialize_mock_data()
+        FIXTURE_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        FIXTURE_CACHE.write_bytes(conn.serialize())
+
+
 def test_database():
     """Test database functionality"""
     print("🧪 Testing SQLite Database Integration...")
-    
-    # Test database manager
-    db = DatabaseManager("backend/database/test_sqrs.db")
-    
+
+    # In-memory database: no disk fsync per insert and nothing left on
+    # disk to clean up afterwards
+    db = DatabaseManager(":memory:")
+
+    # Data store integration first (restore replaces the whole database,
+    # so the customer checks below run on top of the mock baseline); the
+    # shared manager keeps it off its own on-disk file
+    data_store = DataStore(db=db)
+    initialize_mock_data_cached(db, data_store)
+
+    mock_customers = data_store.get_customers()
+    agents = data_store.get_agents()
+
+    print(f"✅ Data Store - Customers: {len(mock_customers)}, Agents: {len(agents)}")
+
     # Test customer operations
     test_customer = Customer(
         name="Test Customer",
@@ -26,32 +56,42 @@ def test_database():
         issue_type="technical_support",
         channel="phone",
         priority=8,
-        issue_complexity=3
+        issue_complexity=3,
+        wait_time=0
     )
-    
+
     # Add customer
     success = db.add_customer(test_customer)
     print(f"✅ Add customer: {success}")
-    
+
+    # Bulk add: one executemany transaction (one fsync) instead of a
+    # commit per row
+    batch = [
+        Customer(
+            name=f"Bulk Test Customer {i}",
+            sentiment="neutral",
+            tier="standard",
+            issue_type="billing",
+            channel="chat",
+            priority=5,
+            issue_complexity=2,
+            wait_time=0
+        )
+        for i in range(100)
+    ]
+    success = db.add_customers_bulk(batch)
+    print(f"✅ Bulk add customers: {success} ({len(batch)} rows)")
+
     # Get customers
     customers = db.get_customers()
     print(f"✅ Get customers: {len(customers)} found")
-    
-    # Test data store integration
-    data_store = DataStore()
-    data_store.initialize_mock_data()
-    
-    customers = data_store.get_customers()
-    agents = data_store.get_agents()
-    
-    print(f"✅ Data Store - Customers: {len(customers)}, Agents: {len(agents)}")
-    
+
     # Test settings
     db.save_setting("test_setting", {"value": 123}, "test")
     retrieved = db.get_setting("test_setting")
     print(f"✅ Settings: {retrieved}")
-    
+
     print("🎉 Database tests completed successfully!")
 
 if __name__ == "__main__":
-    test_database()
\ No newline at end of file
+    test_database()
@@ -3,162 +3,256 @@
 Test script to check frontend functionality issues
 """
 
+import asyncio
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import io
+import sys
+import traceback
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
 import time
 
 BASE_URL = "http://localhost:8000"
 
+# Bounded connect/read so one hung socket can't stall the whole run
+TIMEOUT = (3.0, 10.0)
+
+# URLs and request bodies are loop/run-invariant: build the strings once
+# and pre-encode the JSON once instead of per call
+CUSTOMERS_URL = f"{BASE_URL}/customers"
+SUBMIT_QUERY_URL = f"{BASE_URL}/customer/submit-query"
+HEALTH_URL = f"{BASE_URL}/health"
+JSON_HEADERS = {"Content-Type": "application/json"}
+CORS_HEADER_NAMES = (
+    'Access-Control-Allow-Origin',
+    'Access-Control-Allow-Methods',
+    'Access-Control-Allow-Headers',
+)
+
+ADMIN_CUSTOMER_DATA = {
+    "name": "Admin Added Customer",
+    "sentiment": "neutral",
+    "tier": "standard",
+    "issue_type": "technical_support",
+    "issue_complexity": 3.0,
+    "channel": "chat",
+    "priority": 5
+}
+ADMIN_CUSTOMER_PAYLOAD = orjson.dumps(ADMIN_CUSTOMER_DATA)
+
+QUERY_DATA = {
+    "customer_email": "customer@example.com",
+    "customer_name": "Query Customer",
+    "sentiment": "neutral",
+    "tier": "standard",
+    "issue_type": "billing",
+    "issue_description": "I have a question about my bill",
+    "channel": "phone",
+    "priority": 5,
+    "issue_complexity": 2.0
+}
+QUERY_PAYLOAD = orjson.dumps(QUERY_DATA)
+
+INVALID_CUSTOMER_PAYLOAD = orjson.dumps({
+    "name": "",  # Empty name
+    "sentiment": "invalid",  # Invalid sentiment
+    "tier": "standard",
+    "issue_type": "technical_support",
+    "issue_complexity": 10.0,  # Invalid complexity
+    "channel": "chat",
+    "priority": 15  # Invalid priority
+})
+
+# One pooled session for the whole run: every probe reuses the same
+# keep-alive socket instead of paying a TCP handshake per call
+SESSION = requests.Session()
+SESSION.headers.update({"Connection": "keep-alive"})
+SESSION.mount("http://", HTTPAdapter(
+    pool_connections=10, pool_maxsize=10,
+    max_retries=Retry(total=2, backoff_factor=0.2)))
+atexit.register(SESSION.close)
+
+# Prepared once: Session.send() skips the per-call header merging, auth
+# resolution and URL parsing that Session.post() redoes every time
+INVALID_CUSTOMER_REQUEST = SESSION.prepare_request(requests.Request(
+    "POST", CUSTOMERS_URL, data=INVALID_CUSTOMER_PAYLOAD, headers=JSON_HEADERS))
+
+@functools.lru_cache(maxsize=1)
+def ensure_backend_up():
+    """Probe /health once per process; later callers reuse the answer"""
+    try:
+        response = SESSION.get(HEALTH_URL, timeout=TIMEOUT)
+        return response.status_code == 200
+    except requests.RequestException:
+        return False
+
+
 def test_customer_endpoints():
     """Test customer-related endpoints"""
-    print("🧪 Testing Customer Endpoints")
-    print("=" * 50)
-    
+    # Buffer the report and write it once: a single stdout syscall at the
+    # end instead of a flush per line, and no interleaving with the
+    # concurrently running connectivity test
+    buf = io.StringIO()
+
+    def out(msg=""):
+        buf.write(f"{msg}\n")
+
     try:
-        # Test 1: Admin add customer endpoint
-        print("\n1️⃣ Testing Admin Add Customer...")
-        admin_customer_data = {
-            "name": "Admin Added Customer",
-            "sentiment": "neutral",
-            "tier": "standard", 
-            "issue_type": "technical_support",
-            "issue_complexity": 3.0,
-            "channel": "chat",
-            "priority": 5
-        }
-        
-        response = requests.post(f"{BASE_URL}/customers", json=admin_customer_data)
-        print(f"   Status: {response.status_code}")
-        
-        if response.status_code == 200:
-            data = response.json()
-            print(f"   ✅ Customer added: {data['customer']['name']}")
-            print(f"   📋 Customer ID: {data['customer']['id']}")
-        else:
-            print(f"   ❌ Failed: {response.text}")
-        
-        # Test 2: Customer submit query endpoint
-        print("\n2️⃣ Testing Customer Submit Query...")
-        query_data = {
-            "customer_email": "customer@example.com",
-            "customer_name": "Query Customer",
-            "sentiment": "neutral",
-            "tier": "standard",
-            "issue_type": "billing",
-            "issue_description": "I have a question about my bill",
-            "channel": "phone",
-            "priority": 5,
-            "issue_complexity": 2.0
-        }
-        
-        response = requests.post(f"{BASE_URL}/customer/submit-query", json=query_data)
-        print(f"   Status: {response.status_code}")
-        
-        if response.status_code == 200:
-            data = response.json()
-            print(f"   ✅ Query submitted: {data['customer']['name']}")
-            print(f"   📍 Queue position: {data['queue_position']}")
-            print(f"   ⏱️ Estimated wait: {data['estimated_wait_time']} minutes")
-        else:
-            print(f"   ❌ Failed: {response.text}")
-        
-        # Test 3: Check customers in queue
-        print("\n3️⃣ Checking customers in queue...")
-        response = requests.get(f"{BASE_URL}/customers")
-        
-        if response.status_code == 200:
-            data = response.json()
-            print(f"   📊 Total customers in queue: {data['count']}")
-            
-            if data['customers']:
-                print("   👥 Recent customers:")
-                for i, customer in enumerate(data['customers'][-3:], 1):
-                    print(f"      {i}. {customer['name']} - {customer['issue_type']} ({customer['tier']})")
-        else:
-            print(f"   ❌ Failed to get customers: {response.text}")
-        
-        # Test 4: Check CORS headers
-        print("\n4️⃣ Checking CORS configuration...")
-        response = requests.options(f"{BASE_URL}/customers")
-        print(f"   OPTIONS status: {response.status_code}")
-        
-        cors_headers = {
-            'Access-Control-Allow-Origin': response.headers.get('Access-Control-Allow-Origin'),
-            'Access-Control-Allow-Methods': response.headers.get('Access-Control-Allow-Methods'),
-            'Access-Control-Allow-Headers': response.headers.get('Access-Control-Allow-Headers')
-        }
-        
-        for header, value in cors_headers.items():
-            if value:
-                print(f"   ✅ {header}: {value}")
+        out("🧪 Testing Customer Endpoints")
+        out("=" * 50)
+
+        if not ensure_backend_up():
+            out("❌ Backend is not reachable - skipping customer endpoint tests")
+            return
+
+        try:
+            # The creation POSTs hit different endpoints and different rows,
+            # and the CORS preflight is read-only, so fan all three out over
+            # the shared Session (urllib3's pool multiplexes across threads)
+            # and keep the prints afterwards in step order
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                admin_future = executor.submit(
+                    SESSION.post, CUSTOMERS_URL, data=ADMIN_CUSTOMER_PAYLOAD,
+                    headers=JSON_HEADERS, timeout=TIMEOUT)
+                query_future = executor.submit(
+                    SESSION.post, SUBMIT_QUERY_URL, data=QUERY_PAYLOAD,
+                    headers=JSON_HEADERS, timeout=TIMEOUT)
+                options_future = executor.submit(
+                    SESSION.options, CUSTOMERS_URL, timeout=TIMEOUT)
+                admin_response = admin_future.result()
+                query_response = query_future.result()
+                options_response = options_future.result()
+
+            # Test 1: Admin add customer endpoint
+            out("\n1️⃣ Testing Admin Add Customer...")
+            out(f"   Status: {admin_response.status_code}")
+
+            if admin_response.status_code == 200:
+                data = orjson.loads(admin_response.content)
+                out(f"   ✅ Customer added: {data['customer']['name']}")
+                out(f"   📋 Customer ID: {data['customer']['id']}")
+            else:
+                out(f"   ❌ Failed: {admin_response.text}")
+
+            # Test 2: Customer submit query endpoint
+            out("\n2️⃣ Testing Customer Submit Query...")
+            out(f"   Status: {query_response.status_code}")
+
+            if query_response.status_code == 200:
+                data = orjson.loads(query_response.content)
+                out(f"   ✅ Query submitted: {data['customer']['name']}")
+                out(f"   📍 Queue position: {data['queue_position']}")
+                out(f"   ⏱️ Estimated wait: {data['estimated_wait_time']} minutes")
+            else:
+                out(f"   ❌ Failed: {query_response.text}")
+
+            # Test 3: Check customers in queue
+            out("\n3️⃣ Checking customers in queue...")
+            response = SESSION.get(CUSTOMERS_URL, timeout=TIMEOUT)
+
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+                out(f"   📊 Total customers in queue: {data['count']}")
+
+                if data['customers']:
+                    out("   👥 Recent customers:")
+                    for i, customer in enumerate(data['customers'][-3:], 1):
+                        out(f"      {i}. {customer['name']} - {customer['issue_type']} ({customer['tier']})")
             else:
-                print(f"   ⚠️ {header}: Not set")
-        
-        # Test 5: Test with invalid data
-        print("\n5️⃣ Testing with invalid data...")
-        invalid_data = {
-            "name": "",  # Empty name
-            "sentiment": "invalid",  # Invalid sentiment
-            "tier": "standard",
-            "issue_type": "technical_support",
-            "issue_complexity": 10.0,  # Invalid complexity
-            "channel": "chat",
-            "priority": 15  # Invalid priority
-        }
-        
-        response = requests.post(f"{BASE_URL}/customers", json=invalid_data)
-        print(f"   Status: {response.status_code}")
-        
-        if response.status_code != 200:
-            print(f"   ✅ Correctly rejected invalid data")
-            print(f"   📝 Error: {response.json().get('error', 'No error message')}")
-        else:
-            print(f"   ⚠️ Unexpectedly accepted invalid data")
-        
-        print("\n" + "=" * 50)
-        print("🎉 Customer Endpoints Test Complete!")
-        
-    except Exception as e:
-        print(f"❌ Test failed with error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+                out(f"   ❌ Failed to get customers: {response.text}")
+
+            # Test 4: Check CORS headers (probe already overlapped with the
+            # creation POSTs above)
+            out("\n4️⃣ Checking CORS configuration...")
+            out(f"   OPTIONS status: {options_response.status_code}")
+
+            cors_headers = {h: options_response.headers.get(h)
+                            for h in CORS_HEADER_NAMES}
+
+            for header, value in cors_headers.items():
+                if value:
+                    out(f"   ✅ {header}: {value}")
+                else:
+                    out(f"   ⚠️ {header}: Not set")
+
+            # Test 5: Test with invalid data
+            out("\n5️⃣ Testing with invalid data...")
+            response = SESSION.send(INVALID_CUSTOMER_REQUEST, timeout=TIMEOUT)
+            out(f"   Status: {response.status_code}")
+
+            if response.status_code != 200:
+                out(f"   ✅ Correctly rejected invalid data")
+                out(f"   📝 Error: {orjson.loads(response.content).get('error', 'No error message')}")
+            else:
+                out(f"   ⚠️ Unexpectedly accepted invalid data")
+
+            out("\n" + "=" * 50)
+            out("🎉 Customer Endpoints Test Complete!")
+
+        except Exception as e:
+            out(f"❌ Test failed with error: {str(e)}")
+            out(traceback.format_exc())
+    finally:
+        sys.stdout.write(buf.getvalue())
+        sys.stdout.flush()
 
 
 def test_frontend_connectivity():
     """Test if frontend can connect to backend"""
-    print("\n🌐 Testing Frontend Connectivity")
-    print("=" * 30)
-    
+    buf = io.StringIO()
+
+    def out(msg=""):
+        buf.write(f"{msg}\n")
+
     try:
-        # Test basic connectivity
-        response = requests.get(f"{BASE_URL}/health")
-        print(f"Health check: {response.status_code}")
-        
-        if response.status_code == 200:
-            print("✅ Backend is accessible")
-        else:
-            print("❌ Backend connectivity issue")
-        
-        # Test with browser-like headers
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'application/json',
-            'Origin': 'http://localhost:3000',
-            'Referer': 'http://localhost:3000/'
-        }
-        
-        response = requests.get(f"{BASE_URL}/customers", headers=headers)
-        print(f"With browser headers: {response.status_code}")
-        
-        if response.status_code == 200:
-            print("✅ CORS working correctly")
-        else:
-            print("❌ CORS issue detected")
-            
-    except Exception as e:
-        print(f"❌ Connectivity test failed: {str(e)}")
+        out("\n🌐 Testing Frontend Connectivity")
+        out("=" * 30)
+
+        try:
+            # Test basic connectivity (cached: the warm-up probe already ran
+            # once per process, so this costs no extra round-trip)
+            if ensure_backend_up():
+                out("✅ Backend is accessible")
+            else:
+                out("❌ Backend connectivity issue")
+                return
+
+            # Test with browser-like headers
+            headers = {
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+                'Accept': 'application/json',
+                'Origin': 'http://localhost:3000',
+                'Referer': 'http://localhost:3000/'
+            }
+
+            response = SESSION.get(CUSTOMERS_URL, headers=headers, timeout=TIMEOUT)
+            out(f"With browser headers: {response.status_code}")
+
+            if response.status_code == 200:
+                out("✅ CORS working correctly")
+            else:
+                out("❌ CORS issue detected")
+
+        except Exception as e:
+            out(f"❌ Connectivity test failed: {str(e)}")
+    finally:
+        sys.stdout.write(buf.getvalue())
+        sys.stdout.flush()
+
+
+async def _run_all():
+    # The two tests hit disjoint endpoints over the shared thread-safe
+    # Session, so overlap them: wall time is the slower of the two
+    # instead of their sum
+    await asyncio.gather(
+        asyncio.to_thread(test_customer_endpoints),
+        asyncio.to_thread(test_frontend_connectivity),
+    )
 
 
 if __name__ == "__main__":
-    test_customer_endpoints()
-    test_frontend_connectivity()
\ No newline at end of file
+    asyncio.run(_run_all())
\ No newline at end of file
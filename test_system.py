@@ -4,75 +4,188 @@ Comprehensive System Test for AI Smart Queue Routing System
 Tests all major functionality including API endpoints, ML model, and integration
 """
 
-import requests
+from array import array
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import httpx
+import ijson
+import io
 import json
+import orjson
+import statistics
+from statistics import fmean
 import time
+import timeit
 import sys
 from typing import Dict, List, Any
 import subprocess
 import os
 
+_JSON_HEADERS = {"content-type": "application/json"}
+
+
+def _json(response):
+    """Decode a response body with orjson (takes the bytes directly)"""
+    return orjson.loads(response.content)
+
+
+class _IterReader(io.RawIOBase):
+    """Minimal file-like view over an iterator of byte chunks"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, target):
+        while not self._buffer:
+            try:
+                self._buffer = next(self._chunks)
+            except StopIteration:
+                return 0
+        n = min(len(target), len(self._buffer))
+        target[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+# Constant request body: built and encoded once at import instead of a
+# fresh dict + serialization per call
+_NEW_CUSTOMER_BYTES = json.dumps({
+    "name": "Test Customer",
+    "sentiment": "neutral",
+    "tier": "silver",
+    "issue_type": "technical_support",
+    "channel": "phone",
+    "priority": 3,
+    "issue_complexity": 2
+}).encode()
+
 class SystemTester:
+    # Endpoint paths interned once at class definition instead of fresh
+    # string literals scattered through the test methods
+    URLS = {
+        "health": "/health",
+        "customers": "/customers",
+        "agents": "/agents",
+        "route": "/route",
+        "reset": "/route/reset",
+        "model_info": "/ai/model/info",
+        "model_perf": "/ai/model/performance",
+        "analytics": "/analytics/performance",
+    }
+
     def __init__(self, base_url: str = "http://localhost:8000"):
         self.base_url = base_url
-        self.test_results = []
+        # One pooled client for every test: keep-alive sockets are reused
+        # across calls instead of paying a TCP handshake per request
+        # http2=True lets concurrent calls multiplex over one TCP stream
+        # when the server advertises h2 (transparent fallback otherwise)
+        self.client = httpx.Client(
+            base_url=base_url, timeout=5.0, http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20))
+        # Columnar result storage: four flat columns instead of a dict per
+        # test, with the flags and response times packed into C arrays
+        self._names: list = []
+        self._success = array('b')
+        self._messages: list = []
+        self._rts = array('d')
+        # Flipped by the health check; later tests skip their requests
+        # instead of each burning a full connect timeout on a dead backend
+        self._alive = True
+        # log_test is called from concurrently running tests; lines are
+        # buffered and flushed once per section instead of a stdout write
+        # (and flush) per call interleaving across threads
+        self._log_lines = deque()
+        self._log_lock = threading.Lock()
+        self._executor = None
+        # Measured overhead of a perf_counter() call pair, subtracted from
+        # every reported latency so sub-millisecond timings aren't inflated
+        # by the timer itself
+        self._bias = min(timeit.repeat(
+            lambda: (time.perf_counter(), time.perf_counter()),
+            number=10000, repeat=5)) / 10000
+
+    @property
+    def executor(self):
+        """Thread pool shared across runs, built on first use"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=20)
+        return self._executor
+
+    def close(self):
+        """Release the pooled connections and worker threads"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        self.client.close()
         
     def log_test(self, test_name: str, success: bool, message: str = "", response_time: float = 0):
         """Log test results"""
         status = "✅ PASS" if success else "❌ FAIL"
-        self.test_results.append({
-            "test": test_name,
-            "success": success,
-            "message": message,
-            "response_time": response_time
-        })
-        print(f"{status} {test_name} ({response_time:.3f}s) - {message}")
+        if response_time > 0:
+            response_time = max(0.0, response_time - self._bias)
+        with self._log_lock:
+            self._names.append(test_name)
+            self._success.append(success)
+            self._messages.append(message)
+            self._rts.append(response_time)
+            self._log_lines.append(f"{status} {test_name} ({response_time:.3f}s) - {message}")
+
+    def _flush_log(self):
+        """Write the buffered test lines in one stdout syscall"""
+        with self._log_lock:
+            if not self._log_lines:
+                return
+            block = "".join(f"{line}\n" for line in self._log_lines)
+            self._log_lines.clear()
+        sys.stdout.write(block)
+        sys.stdout.flush()
         
     def test_health_check(self):
         """Test basic health endpoint"""
         try:
-            start_time = time.time()
-            response = requests.get(f"{self.base_url}/health", timeout=5)
-            response_time = time.time() - start_time
+            start_time = time.perf_counter()
+            response = self.client.get(self.URLS["health"])
+            response_time = time.perf_counter() - start_time
             
             if response.status_code == 200:
-                data = response.json()
+                data = _json(response)
+                self._alive = True
                 self.log_test("Health Check", True, f"Status: {data.get('status')}", response_time)
                 return True
             else:
+                self._alive = False
                 self.log_test("Health Check", False, f"Status code: {response.status_code}", response_time)
                 return False
         except Exception as e:
+            self._alive = False
             self.log_test("Health Check", False, f"Error: {str(e)}")
             return False
             
     def test_customers_endpoint(self):
         """Test customer management endpoints"""
+        if not self._alive:
+            self.log_test("Customer Endpoints", False, "backend down", 0)
+            return False
         try:
             # Test GET customers
-            start_time = time.time()
-            response = requests.get(f"{self.base_url}/customers")
-            response_time = time.time() - start_time
+            start_time = time.perf_counter()
+            response = self.client.get(self.URLS["customers"])
+            response_time = time.perf_counter() - start_time
             
             if response.status_code == 200:
-                data = response.json()
+                data = _json(response)
                 customer_count = data.get('count', 0)
                 self.log_test("GET Customers", True, f"Found {customer_count} customers", response_time)
                 
                 # Test POST customer
-                new_customer = {
-                    "name": "Test Customer",
-                    "sentiment": "neutral",
-                    "tier": "silver",
-                    "issue_type": "technical_support",
-                    "channel": "phone",
-                    "priority": 3,
-                    "issue_complexity": 2
-                }
-                
-                start_time = time.time()
-                response = requests.post(f"{self.base_url}/customers", json=new_customer)
-                response_time = time.time() - start_time
+                start_time = time.perf_counter()
+                response = self.client.post(self.URLS["customers"], content=_NEW_CUSTOMER_BYTES,
+                                            headers=_JSON_HEADERS)
+                response_time = time.perf_counter() - start_time
                 
                 if response.status_code == 200:
                     self.log_test("POST Customer", True, "Customer added successfully", response_time)
@@ -90,13 +203,16 @@ class SystemTester:
             
     def test_agents_endpoint(self):
         """Test agent management endpoints"""
+        if not self._alive:
+            self.log_test("Agent Endpoints", False, "backend down", 0)
+            return False
         try:
-            start_time = time.time()
-            response = requests.get(f"{self.base_url}/agents")
-            response_time = time.time() - start_time
+            start_time = time.perf_counter()
+            response = self.client.get(self.URLS["agents"])
+            response_time = time.perf_counter() - start_time
             
             if response.status_code == 200:
-                data = response.json()
+                data = _json(response)
                 agent_count = data.get('total_count', 0)
                 available_count = data.get('available_count', 0)
                 self.log_test("GET Agents", True, f"{available_count}/{agent_count} agents available", response_time)
@@ -111,14 +227,17 @@ class SystemTester:
             
     def test_routing_functionality(self):
         """Test AI routing functionality"""
+        if not self._alive:
+            self.log_test("Routing Functionality", False, "backend down", 0)
+            return False
         try:
             # Test auto routing
-            start_time = time.time()
-            response = requests.post(f"{self.base_url}/route")
-            response_time = time.time() - start_time
+            start_time = time.perf_counter()
+            response = self.client.post(self.URLS["route"])
+            response_time = time.perf_counter() - start_time
             
             if response.status_code == 200:
-                data = response.json()
+                data = _json(response)
                 results_count = len(data.get('results', []))
                 stats = data.get('statistics', {})
                 avg_score = stats.get('average_score', 0)
@@ -128,9 +247,9 @@ class SystemTester:
                              response_time)
                 
                 # Test reset functionality
-                start_time = time.time()
-                response = requests.post(f"{self.base_url}/route/reset")
-                response_time = time.time() - start_time
+                start_time = time.perf_counter()
+                response = self.client.post(self.URLS["reset"])
+                response_time = time.perf_counter() - start_time
                 
                 if response.status_code == 200:
                     self.log_test("Reset Queue", True, "Queue reset successfully", response_time)
@@ -148,25 +267,28 @@ class SystemTester:
             
     def test_ai_model_endpoints(self):
         """Test AI model management endpoints"""
+        if not self._alive:
+            self.log_test("AI Model Endpoints", False, "backend down", 0)
+            return False
         try:
             # Test model info
-            start_time = time.time()
-            response = requests.get(f"{self.base_url}/ai/model/info")
-            response_time = time.time() - start_time
+            start_time = time.perf_counter()
+            response = self.client.get(self.URLS["model_info"])
+            response_time = time.perf_counter() - start_time
             
             if response.status_code == 200:
-                data = response.json()
+                data = _json(response)
                 model_stats = data.get('model_stats', {})
                 accuracy = model_stats.get('accuracy', 0)
                 self.log_test("AI Model Info", True, f"Model accuracy: {accuracy:.1%}", response_time)
                 
                 # Test model performance
-                start_time = time.time()
-                response = requests.get(f"{self.base_url}/ai/model/performance")
-                response_time = time.time() - start_time
+                start_time = time.perf_counter()
+                response = self.client.get(self.URLS["model_perf"])
+                response_time = time.perf_counter() - start_time
                 
                 if response.status_code == 200:
-                    data = response.json()
+                    data = _json(response)
                     performance = data.get('current_performance', {})
                     auc_score = performance.get('auc_score', 0)
                     self.log_test("AI Model Performance", True, f"AUC Score: {auc_score:.3f}", response_time)
@@ -184,13 +306,16 @@ class SystemTester:
             
     def test_analytics_endpoint(self):
         """Test analytics and performance metrics"""
+        if not self._alive:
+            self.log_test("Analytics Endpoint", False, "backend down", 0)
+            return False
         try:
-            start_time = time.time()
-            response = requests.get(f"{self.base_url}/analytics/performance")
-            response_time = time.time() - start_time
+            start_time = time.perf_counter()
+            response = self.client.get(self.URLS["analytics"])
+            response_time = time.perf_counter() - start_time
             
             if response.status_code == 200:
-                data = response.json()
+                data = _json(response)
                 queue_metrics = data.get('queue_metrics', {})
                 customers_waiting = queue_metrics.get('customers_waiting', 0)
                 agents_available = queue_metrics.get('agents_available', 0)
@@ -207,41 +332,61 @@ class SystemTester:
             self.log_test("Analytics Endpoint", False, f"Error: {str(e)}")
             return False
             
-    def test_performance_benchmarks(self):
+    async def _bench(self, n_requests: int = 20, concurrency: int = 20):
+        """Issue n_requests GETs with bounded concurrency on one event loop"""
+        sem = asyncio.Semaphore(concurrency)
+
+        async def make_request(client):
+            async with sem:
+                try:
+                    start = time.perf_counter()
+                    response = await client.get(self.URLS["customers"])
+                    return time.perf_counter() - start, response.status_code == 200
+                except Exception:
+                    return 0, False
+
+        async with httpx.AsyncClient(
+                base_url=self.base_url, timeout=5.0,
+                limits=httpx.Limits(max_connections=concurrency)) as client:
+            return await asyncio.gather(
+                *(make_request(client) for _ in range(n_requests)))
+
+    def test_performance_benchmarks(self, n_requests: int = 20, concurrency: int = 20):
         """Test system performance under load"""
+        if not self._alive:
+            self.log_test("Performance Benchmark", False, "backend down", 0)
+            return False
         try:
             print("\n🚀 Running Performance Benchmarks...")
             
-            # Test multiple concurrent requests
-            import concurrent.futures
-            import threading
+            # Concurrent requests multiplex on one event loop and a shared
+            # pool instead of spawning an OS thread per request. Throughput
+            # comes from one timer pair around the whole burst, so the
+            # aggregate number carries no accumulated per-call timer cost
+            t0 = time.perf_counter()
+            results = asyncio.run(self._bench(n_requests, concurrency))
+            elapsed = time.perf_counter() - t0
+            throughput = len(results) / elapsed if elapsed > 0 else 0.0
             
-            def make_request():
-                try:
-                    start = time.time()
-                    response = requests.get(f"{self.base_url}/customers", timeout=5)
-                    return time.time() - start, response.status_code == 200
-                except:
-                    return 0, False
-            
-            # Run 20 concurrent requests
-            with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                futures = [executor.submit(make_request) for _ in range(20)]
-                results = [future.result() for future in concurrent.futures.as_completed(futures)]
-            
-            response_times = [r[0] for r in results if r[1]]
+            response_times = sorted(r[0] for r in results if r[1])
             success_rate = len(response_times) / len(results)
-            avg_response_time = sum(response_times) / len(response_times) if response_times else 0
+            avg_response_time = fmean(response_times) if response_times else 0.0
+
+            # Tail latency is what SLOs care about; the mean hides it
+            if len(response_times) >= 2:
+                centiles = statistics.quantiles(response_times, n=100)
+                p50, p95, p99 = centiles[49], centiles[94], centiles[98]
+            else:
+                p50 = p95 = p99 = avg_response_time
+            message = (f"Success rate: {success_rate:.1%}, Avg: {avg_response_time:.3f}s, "
+                       f"p50/p95/p99: {p50:.3f}/{p95:.3f}/{p99:.3f}s, "
+                       f"{throughput:.0f} req/s")
             
             if success_rate >= 0.95 and avg_response_time < 1.0:
-                self.log_test("Performance Benchmark", True, 
-                             f"Success rate: {success_rate:.1%}, Avg time: {avg_response_time:.3f}s", 
-                             avg_response_time)
+                self.log_test("Performance Benchmark", True, message, avg_response_time)
                 return True
             else:
-                self.log_test("Performance Benchmark", False, 
-                             f"Success rate: {success_rate:.1%}, Avg time: {avg_response_time:.3f}s", 
-                             avg_response_time)
+                self.log_test("Performance Benchmark", False, message, avg_response_time)
                 return False
                 
         except Exception as e:
@@ -250,46 +395,50 @@ class SystemTester:
             
     def test_ml_model_accuracy(self):
         """Test ML model predictions"""
+        if not self._alive:
+            self.log_test("ML Model Accuracy", False, "backend down", 0)
+            return False
         try:
-            # First get some customers and agents
-            customers_response = requests.get(f"{self.base_url}/customers")
-            agents_response = requests.get(f"{self.base_url}/agents")
-            
-            if customers_response.status_code == 200 and agents_response.status_code == 200:
-                # Perform routing to test ML predictions
-                start_time = time.time()
-                routing_response = requests.post(f"{self.base_url}/route")
-                response_time = time.time() - start_time
-                
-                if routing_response.status_code == 200:
-                    data = routing_response.json()
-                    results = data.get('results', [])
-                    
-                    if results:
-                        scores = [r.get('routing_score', 0) for r in results]
-                        avg_score = sum(scores) / len(scores)
-                        min_score = min(scores)
-                        max_score = max(scores)
-                        
-                        # Check if scores are reasonable (between 0 and 1)
-                        if 0 <= min_score <= max_score <= 1 and avg_score > 0.5:
-                            self.log_test("ML Model Accuracy", True, 
-                                         f"Avg score: {avg_score:.3f}, Range: {min_score:.3f}-{max_score:.3f}", 
-                                         response_time)
-                            return True
-                        else:
-                            self.log_test("ML Model Accuracy", False, 
-                                         f"Invalid scores: {min_score:.3f}-{max_score:.3f}", 
-                                         response_time)
-                            return False
-                    else:
-                        self.log_test("ML Model Accuracy", False, "No routing results generated", response_time)
-                        return False
-                else:
+            # No pre-flight /customers + /agents probes: those endpoints are
+            # already exercised earlier in the run, and a 200 from /route
+            # proves its data sources are reachable anyway. Stream just the
+            # routing_score fields out of the body with running aggregates
+            # instead of materializing every result dict
+            start_time = time.perf_counter()
+            with self.client.stream("POST", self.URLS["route"]) as routing_response:
+                if routing_response.status_code != 200:
                     self.log_test("ML Model Accuracy", False, f"Routing failed: {routing_response.status_code}")
                     return False
+
+                count = 0
+                total = 0.0
+                min_score = float("inf")
+                max_score = float("-inf")
+                for score in ijson.items(_IterReader(routing_response.iter_bytes()),
+                                         'results.item.routing_score'):
+                    score = float(score)
+                    count += 1
+                    total += score
+                    min_score = min(min_score, score)
+                    max_score = max(max_score, score)
+            response_time = time.perf_counter() - start_time
+
+            if count:
+                avg_score = total / count
+
+                # Check if scores are reasonable (between 0 and 1)
+                if 0 <= min_score <= max_score <= 1 and avg_score > 0.5:
+                    self.log_test("ML Model Accuracy", True, 
+                                 f"Avg score: {avg_score:.3f}, Range: {min_score:.3f}-{max_score:.3f}", 
+                                 response_time)
+                    return True
+                else:
+                    self.log_test("ML Model Accuracy", False, 
+                                 f"Invalid scores: {min_score:.3f}-{max_score:.3f}", 
+                                 response_time)
+                    return False
             else:
-                self.log_test("ML Model Accuracy", False, "Failed to get customers/agents")
+                self.log_test("ML Model Accuracy", False, "No routing results generated", response_time)
                 return False
                 
         except Exception as e:
@@ -303,23 +452,34 @@ class SystemTester:
         
         # Check if backend is running
         if not self.test_health_check():
+            self._flush_log()
             print("\n❌ Backend server is not running. Please start it with:")
             print("   cd backend && python app.py")
             return False
             
         print("\n📡 Testing API Endpoints...")
-        self.test_customers_endpoint()
-        self.test_agents_endpoint()
+        # These four hit disjoint endpoints and don't mutate queue state,
+        # so overlap them; the shared httpx.Client is thread-safe
+        independent_tests = [
+            self.test_customers_endpoint,
+            self.test_agents_endpoint,
+            self.test_ai_model_endpoints,
+            self.test_analytics_endpoint,
+        ]
+        list(self.executor.map(lambda test: test(), independent_tests))
+
+        # Routing mutates queue state, so it stays sequential
         self.test_routing_functionality()
-        self.test_ai_model_endpoints()
-        self.test_analytics_endpoint()
-        
+        self._flush_log()
+
         print("\n🤖 Testing ML Model...")
         self.test_ml_model_accuracy()
-        
+        self._flush_log()
+
         print("\n⚡ Testing Performance...")
         self.test_performance_benchmarks()
-        
+        self._flush_log()
+
         # Generate test report
         self.generate_report()
         
@@ -327,32 +487,34 @@ class SystemTester:
         
     def generate_report(self):
         """Generate comprehensive test report"""
+        self._flush_log()
         print("\n" + "=" * 80)
         print("📊 TEST REPORT SUMMARY")
         print("=" * 80)
         
-        total_tests = len(self.test_results)
-        passed_tests = len([t for t in self.test_results if t['success']])
+        # One pass over the columns instead of a comprehension per metric
+        total_tests = len(self._names)
+        passed_tests = sum(self._success)
+        response_times = [rt for rt in self._rts if rt > 0]
         failed_tests = total_tests - passed_tests
         success_rate = (passed_tests / total_tests) * 100 if total_tests > 0 else 0
-        
+
         print(f"Total Tests: {total_tests}")
         print(f"Passed: {passed_tests} ✅")
         print(f"Failed: {failed_tests} ❌")
         print(f"Success Rate: {success_rate:.1f}%")
-        
+
         # Performance metrics
-        response_times = [t['response_time'] for t in self.test_results if t['response_time'] > 0]
         if response_times:
-            avg_response_time = sum(response_times) / len(response_times)
+            avg_response_time = fmean(response_times)
             max_response_time = max(response_times)
             print(f"Average Response Time: {avg_response_time:.3f}s")
             print(f"Max Response Time: {max_response_time:.3f}s")
         
         print("\n📋 Detailed Results:")
-        for test in self.test_results:
-            status = "✅" if test['success'] else "❌"
-            print(f"  {status} {test['test']}: {test['message']}")
+        for name, success, message in zip(self._names, self._success, self._messages):
+            status = "✅" if success else "❌"
+            print(f"  {status} {name}: {message}")
             
         # Overall system health
         print("\n🏥 System Health Assessment:")
@@ -390,6 +552,8 @@ def main():
         print("\n\n⚠️  Tests interrupted by user")
     except Exception as e:
         print(f"\n\n❌ Test suite failed with error: {str(e)}")
+    finally:
+        tester.close()
         
     print("\n🎯 Test suite completed!")
     print("For demo preparation, ensure all tests pass before presenting.")
@@ -0,0 +1,28 @@
+"""
+Shared pytest fixtures for the functionality test suite
+"""
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+BASE_URL = "http://localhost:8000"
+
+
+@pytest.fixture(scope="session")
+def api():
+    """One validated keep-alive session shared by every test in the run
+
+    The health handshake happens exactly once per pytest session instead of
+    once per script; tests receive a Session that is already known-good.
+    """
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=8))
+    try:
+        response = session.get(f"{BASE_URL}/health", timeout=2)
+    except requests.ConnectionError:
+        pytest.skip("backend is not running on port 8000")
+    if response.status_code != 200:
+        pytest.skip(f"backend health check failed: {response.status_code}")
+    yield session
+    session.close()
@@ -0,0 +1,34 @@
+"""
+Pytest entry points for the standalone functionality scripts
+
+The scripts keep working when run directly; under pytest they share one
+session-scoped backend handshake via the `api` fixture and can parallelize
+with pytest-xdist.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import test_both_functionalities
+import test_complete_task
+import test_conversation_timer
+import test_customer_add
+
+
+def test_both_functionalities_flow(api):
+    test_both_functionalities.main()
+
+
+def test_complete_task_flow(api):
+    asyncio.run(test_complete_task.test_complete_task_flow())
+
+
+def test_conversation_timer_flow(api):
+    asyncio.run(test_conversation_timer.test_conversation_timer_system())
+
+
+def test_customer_add_flow(api):
+    test_customer_add.test_add_customer()